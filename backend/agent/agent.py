@@ -1,10 +1,41 @@
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import torch.optim as optim
 import numpy as np
-import random
 import os
-from collections import deque
+
+def _state_to_vec(state, out):
+    """Flatten a state into a preallocated float32 feature vector
+    
+    Args:
+        state: Flat state vector (e.g. from World.get_observation), or a state
+            dictionary with agent_pos, goal_pos, surroundings and rel_goal_pos
+        out (numpy.ndarray): Array of shape (10,) written in place
+        
+    Returns:
+        numpy.ndarray: The filled ``out`` array
+    """
+    if isinstance(state, np.ndarray):
+        out[:] = state
+        return out
+    
+    agent_pos = state['agent_pos']
+    goal_pos = state['goal_pos']
+    surroundings = state['surroundings']
+    rel_goal_pos = state['rel_goal_pos']
+    
+    out[0] = agent_pos[0]
+    out[1] = agent_pos[1]
+    out[2] = goal_pos[0]
+    out[3] = goal_pos[1]
+    out[4] = surroundings[0]
+    out[5] = surroundings[1]
+    out[6] = surroundings[2]
+    out[7] = surroundings[3]
+    out[8] = rel_goal_pos[0]
+    out[9] = rel_goal_pos[1]
+    return out
 
 class QNetwork(nn.Module):
     """Neural network for Q-learning"""
@@ -32,40 +63,90 @@ class QNetwork(nn.Module):
         return self.fc3(x)
 
 class ReplayBuffer:
-    """Experience replay buffer for storing and sampling experiences"""
+    """Experience replay buffer for storing and sampling experiences
+    
+    Experiences are stored as a struct of preallocated tensors written in a
+    circular fashion, so sampling a batch is a single gather per field.
+    """
     
-    def __init__(self, buffer_size=10000, batch_size=64):
+    def __init__(self, state_size, buffer_size=10000, batch_size=64, pin_memory=False):
         """Initialize the replay buffer
         
         Args:
+            state_size (int): Size of the state vector
             buffer_size (int): Maximum size of the buffer
             batch_size (int): Size of the batch to sample
+            pin_memory (bool): Gather sampled batches into page-locked memory
+                so they can be copied to the GPU asynchronously
         """
-        self.buffer = deque(maxlen=buffer_size)
+        self.buffer_size = buffer_size
         self.batch_size = batch_size
+        self.pin_memory = pin_memory
+        
+        self.states = torch.empty((buffer_size, state_size), dtype=torch.float32)
+        self.next_states = torch.empty((buffer_size, state_size), dtype=torch.float32)
+        
+        # Scalar fields are stored as columns so sampled batches already have
+        # the (batch, 1) shape used by gather() and the target computation
+        self.actions = torch.empty((buffer_size, 1), dtype=torch.long)
+        self.rewards = torch.empty((buffer_size, 1), dtype=torch.float32)
+        self.dones = torch.empty((buffer_size, 1), dtype=torch.float32)
+        
+        # NumPy views sharing memory with the state tensors, so states are
+        # flattened straight into their row with no intermediate array
+        self._states_np = self.states.numpy()
+        self._next_states_np = self.next_states.numpy()
+        
+        self.pos = 0  # Next row to write
+        self.size = 0  # Number of rows filled
     
     def add(self, state, action, reward, next_state, done):
         """Add an experience to the buffer"""
-        self.buffer.append((state, action, reward, next_state, done))
+        i = self.pos
+        _state_to_vec(state, self._states_np[i])
+        self.actions[i, 0] = action
+        self.rewards[i, 0] = reward
+        _state_to_vec(next_state, self._next_states_np[i])
+        self.dones[i, 0] = float(done)
+        
+        self.pos = (i + 1) % self.buffer_size
+        self.size = min(self.size + 1, self.buffer_size)
     
     def sample(self):
         """Sample a batch of experiences from the buffer"""
-        if len(self.buffer) < self.batch_size:
+        if self.size < self.batch_size:
             return None
         
-        batch = random.sample(self.buffer, self.batch_size)
-        states, actions, rewards, next_states, dones = zip(*batch)
+        idx = torch.randint(0, self.size, (self.batch_size,))
         
-        return states, actions, rewards, next_states, dones
+        return (
+            self._gather(self.states, idx),
+            self._gather(self.actions, idx),
+            self._gather(self.rewards, idx),
+            self._gather(self.next_states, idx),
+            self._gather(self.dones, idx),
+        )
+    
+    def _gather(self, field, idx):
+        """Gather rows of a field into a new (optionally pinned) batch tensor"""
+        # Batches come from the caching host allocator, which keeps a pinned
+        # block alive until any pending non_blocking copy out of it completes
+        out = torch.empty((len(idx),) + field.shape[1:], dtype=field.dtype,
+                          pin_memory=self.pin_memory)
+        return torch.index_select(field, 0, idx, out=out)
     
     def __len__(self):
         """Return the current size of the buffer"""
-        return len(self.buffer)
+        return self.size
 
 class RLAgent:
     """Reinforcement Learning Agent using Deep Q-Network"""
     
-    def __init__(self, state_size, action_size, hidden_size=128, learning_rate=0.001):
+    # Number of exploration draws taken from the random generator at a time
+    RANDOM_BATCH_SIZE = 1024
+    
+    def __init__(self, state_size, action_size, hidden_size=128, learning_rate=0.001,
+                 compile_network=True, seed=None):
         """Initialize the agent
         
         Args:
@@ -73,25 +154,55 @@ class RLAgent:
             action_size (int): Number of possible actions
             hidden_size (int): Size of the hidden layer in the Q-Network
             learning_rate (float): Learning rate for the optimizer
+            compile_network (bool): Compile the Q-Networks with torch.compile
+                when the installed PyTorch supports it
+            seed (int): Seed for the exploration random generator (None for a random seed)
         """
         self.state_size = state_size
         self.action_size = action_size
         
+        # Exploration randomness is drawn from one generator in batches
+        self._rng = np.random.default_rng(seed)
+        self._draw_random_batch()
+        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        
         # Q-Networks (current and target)
-        self.q_network = QNetwork(state_size, action_size, hidden_size)
-        self.target_network = QNetwork(state_size, action_size, hidden_size)
+        self.q_network = QNetwork(state_size, action_size, hidden_size).to(self.device)
+        self.target_network = QNetwork(state_size, action_size, hidden_size).to(self.device)
         self.target_network.load_state_dict(self.q_network.state_dict())
         
+        # Training modes are set once here rather than toggled on every call
+        self.q_network.train()
+        self.target_network.eval()
+        
+        # Fuse the small Linear/ReLU chain into fixed-shape kernels. Compiling in
+        # place keeps the state_dict keys, so checkpoints stay interchangeable.
+        if compile_network and hasattr(nn.Module, 'compile'):
+            self.q_network.compile(mode="reduce-overhead", dynamic=False)
+            self.target_network.compile(mode="reduce-overhead", dynamic=False)
+        
         # Optimizer
         self.optimizer = optim.Adam(self.q_network.parameters(), lr=learning_rate)
         
-        # Replay buffer
-        self.memory = ReplayBuffer()
+        # Replay buffer (pinning only pays off when batches are copied to a GPU)
+        self.memory = ReplayBuffer(state_size, pin_memory=self.device.type == 'cuda')
+        self._next_batch = None  # Batch prefetched during the previous update
+        
+        # Reusable input buffer for act(), filled in place on every call
+        self._act_state_buf = torch.empty(state_size, dtype=torch.float32,
+                                          pin_memory=self.device.type == 'cuda')
+        self._act_state_np = self._act_state_buf.numpy()
         
         # Learning parameters
         self.batch_size = 64
-        self.update_every = 4  # Update target network every 4 steps
+        self.update_every = 4  # Learn every 4 steps
         self.step_count = 0
+        self._gamma = torch.tensor(0.99, device=self.device)  # Discount factor
+        self.tau = 0.005  # Soft update rate of the target network
+        
+        # Parameter pairs for the in-place target network update
+        self._online_params = list(self.q_network.parameters())
+        self._target_params = list(self.target_network.parameters())
     
     def step(self, state, action, reward, next_state, done):
         """Take a step in the learning process
@@ -123,76 +234,120 @@ class RLAgent:
         Returns:
             int: Selected action
         """
-        # Convert state to tensor for neural network
-        state_tensor = self._preprocess_state(state)
+        # Take the next pre-drawn uniform and random action
+        i = self._random_idx
+        if i == self.RANDOM_BATCH_SIZE:
+            self._draw_random_batch()
+            i = 0
+        self._random_idx = i + 1
         
         # Epsilon-greedy action selection
-        if random.random() > epsilon:
-            # Exploit: choose best action
-            self.q_network.eval()
-            with torch.no_grad():
+        if self._uniforms[i] > epsilon:
+            # Convert state to tensor for neural network
+            state_tensor = self._preprocess_state(state).to(self.device, non_blocking=True)
+            
+            # Exploit: choose best action (the network has no dropout or batch
+            # norm, so there is no need to switch it into eval mode here)
+            with torch.inference_mode():
                 action_values = self.q_network(state_tensor)
-            self.q_network.train()
-            return torch.argmax(action_values).item()
+            return action_values.argmax(dim=-1).item()
         else:
             # Explore: choose random action
-            return random.choice(range(self.action_size))
+            return self._random_actions[i]
+    
+    def act_batch(self, states, epsilon=0.0):
+        """Choose actions for a batch of states, e.g. from vectorized environments
+        
+        All greedy actions come from a single forward pass.
+        
+        Args:
+            states: Sequence of states
+            epsilon (float): Exploration rate (0.0 to 1.0)
+            
+        Returns:
+            numpy.ndarray: Selected action for each state
+        """
+        n = len(states)
+        explore = self._rng.random(n) <= epsilon
+        actions = self._rng.integers(self.action_size, size=n)
+        
+        if not explore.all():
+            # Convert states to a single tensor for the neural network
+            state_batch = np.empty((n, self.state_size), dtype=np.float32)
+            for row, state in zip(state_batch, states):
+                _state_to_vec(state, row)
+            states_tensor = torch.from_numpy(state_batch).to(self.device)
+            
+            # Exploit: choose best actions where not exploring
+            with torch.inference_mode():
+                greedy = self.q_network(states_tensor).argmax(dim=-1).cpu().numpy()
+            actions = np.where(explore, actions, greedy)
+        
+        return actions
+    
+    def _draw_random_batch(self):
+        """Pre-draw a batch of uniforms and random actions for act()"""
+        # Python lists index faster than NumPy arrays for single elements
+        self._uniforms = self._rng.random(self.RANDOM_BATCH_SIZE).tolist()
+        self._random_actions = self._rng.integers(self.action_size, size=self.RANDOM_BATCH_SIZE).tolist()
+        self._random_idx = 0
     
     def learn(self):
         """Update the Q-Network based on experiences"""
-        # Sample experiences from memory
-        experiences = self.memory.sample()
+        # Use the batch prefetched during the previous update if there is one
+        experiences = self._next_batch if self._next_batch is not None else self._fetch_batch()
+        self._next_batch = None
         if experiences is None:
             return
         
-        states, actions, rewards, next_states, dones = experiences
-        
-        # Convert to tensors
-        states_tensor = torch.stack([self._preprocess_state(s) for s in states])
-        actions_tensor = torch.tensor(actions, dtype=torch.long).unsqueeze(1)
-        rewards_tensor = torch.tensor(rewards, dtype=torch.float).unsqueeze(1)
-        next_states_tensor = torch.stack([self._preprocess_state(s) for s in next_states])
-        dones_tensor = torch.tensor(dones, dtype=torch.float).unsqueeze(1)
+        # Experiences arrive as device tensors already shaped for the update
+        states_tensor, actions_tensor, rewards_tensor, next_states_tensor, dones_tensor = experiences
         
         # Get Q-values for current states and actions
         q_values = self.q_network(states_tensor).gather(1, actions_tensor)
         
-        # Get max Q-values for next states using target network
+        # Compute target Q-values from the target network's max over next states
         with torch.no_grad():
-            next_q_values = self.target_network(next_states_tensor).max(1)[0].unsqueeze(1)
-        
-        # Compute target Q-values
-        target_q_values = rewards_tensor + (1 - dones_tensor) * 0.99 * next_q_values
+            next_q_values = self.target_network(next_states_tensor).amax(1, keepdim=True)
+            target_q_values = rewards_tensor + self._gamma * (1 - dones_tensor) * next_q_values
         
         # Compute loss
-        loss = nn.MSELoss()(q_values, target_q_values)
+        loss = F.mse_loss(q_values, target_q_values)
         
         # Update network
         self.optimizer.zero_grad()
         loss.backward()
+        
+        # Start copying the next batch so the transfer overlaps with the optimizer step
+        self._next_batch = self._fetch_batch()
         self.optimizer.step()
         
-        # Update target network
-        if self.step_count % (self.update_every * 10) == 0:
-            self.target_network.load_state_dict(self.q_network.state_dict())
+        # Soft update target network: target = (1 - tau) * target + tau * online
+        with torch.no_grad():
+            for param, target_param in zip(self._online_params, self._target_params):
+                target_param.lerp_(param, self.tau)
+    
+    def _fetch_batch(self):
+        """Sample a batch from memory and start copying it to the device"""
+        experiences = self.memory.sample()
+        if experiences is None:
+            return None
+        
+        # All copies are issued up front so they queue back to back on the copy engine
+        return tuple(t.to(self.device, non_blocking=True) for t in experiences)
     
     def _preprocess_state(self, state):
-        """Convert state dictionary to tensor for neural network input"""
-        # Extract features from state dictionary
-        agent_pos = state['agent_pos']
-        goal_pos = state['goal_pos']
-        surroundings = state['surroundings']
-        rel_goal_pos = state['rel_goal_pos']
-        
-        # Combine all features into a single vector
-        state_vector = np.array([
-            agent_pos[0], agent_pos[1],
-            goal_pos[0], goal_pos[1],
-            surroundings[0], surroundings[1], surroundings[2], surroundings[3],
-            rel_goal_pos[0], rel_goal_pos[1]
-        ], dtype=np.float32)
-        
-        return torch.from_numpy(state_vector)
+        """Convert state to tensor for neural network input
+        
+        Flat float32 state vectors are wrapped without copying. For state
+        dictionaries the returned tensor is a shared buffer overwritten by the
+        next call.
+        """
+        if isinstance(state, np.ndarray) and state.dtype == np.float32:
+            return torch.from_numpy(state)
+        
+        _state_to_vec(state, self._act_state_np)
+        return self._act_state_buf
     
     def save_model(self, filename):
         """Save the model to a file"""
@@ -209,7 +364,7 @@ class RLAgent:
     def load_model(self, filename):
         """Load the model from a file"""
         if os.path.exists(filename):
-            checkpoint = torch.load(filename)
+            checkpoint = torch.load(filename, map_location=self.device)
             self.q_network.load_state_dict(checkpoint['q_network_state'])
             self.target_network.load_state_dict(checkpoint['target_network_state'])
             self.optimizer.load_state_dict(checkpoint['optimizer_state'])
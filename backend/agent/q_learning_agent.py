@@ -1,9 +1,109 @@
 import numpy as np
 import logging
-from collections import defaultdict
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; the kernels below then run as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
 logger = logging.getLogger(__name__)
 
+@njit(cache=True)
+def _move(deltas, x, y, direction, action):
+    """
+    Apply an action to a pose without checking the target cell.
+    
+    Returns:
+        tuple: (x, y, direction) after the action
+    """
+    if action == 0:  # Forward
+        return x + deltas[direction, 0], y + deltas[direction, 1], direction
+    elif action == 1:  # Turn Right
+        return x, y, (direction + 1) & 3
+    elif action == 2:  # Turn Left
+        return x, y, (direction - 1) & 3
+    else:  # Backward
+        return x - deltas[direction, 0], y - deltas[direction, 1], direction
+
+@njit(cache=True)
+def _step_and_update(q_table, padded_grid, deltas, obstacle, x, y, direction, action,
+                     learning_rate, discount_factor, goal_x, goal_y):
+    """
+    Apply one action and the matching Q-learning update.
+    
+    Mirrors QLearningAgent.step followed by QLearningAgent.update_q_table,
+    operating on plain integers so it can be compiled by Numba.
+    
+    Returns:
+        tuple: (x, y, direction, reward, done) after the action
+    """
+    # Execute the action
+    new_x, new_y, new_direction = _move(deltas, x, y, direction, action)
+    
+    # Check if the new position is valid, otherwise stay in place. The padded
+    # grid has an obstacle border, so leaving the world is an obstacle hit too.
+    done = False
+    if padded_grid[new_x + 1, new_y + 1] == obstacle:
+        new_x = x
+        new_y = y
+        reward = -1.0
+    elif new_x == goal_x and new_y == goal_y:
+        reward = 10.0
+        done = True
+    else:
+        reward = -0.1
+    
+    # Q-learning update rule
+    max_next_q = 0.0
+    if not done:
+        max_next_q = q_table[new_x, new_y, new_direction].max()
+    current_q = q_table[x, y, direction, action]
+    q_table[x, y, direction, action] = current_q + learning_rate * (
+        reward + discount_factor * max_next_q - current_q)
+    
+    return new_x, new_y, new_direction, reward, done
+
+@njit(cache=True)
+def _greedy_path(q_table, padded_grid, deltas, obstacle, x, y, direction,
+                 goal_x, goal_y, max_steps):
+    """
+    Follow the greedy policy of a Q-table from a starting pose.
+    
+    Stops at the goal, after max_steps, or when the agent is back where it
+    was two steps earlier (a loop).
+    
+    Returns:
+        tuple: (path, direction) with path an array of visited positions
+    """
+    path = np.empty((max_steps + 1, 2), np.int32)
+    path[0, 0] = x
+    path[0, 1] = y
+    
+    steps = 0
+    while steps < max_steps:
+        # Choose best action according to Q-table (no exploration)
+        action = np.argmax(q_table[x, y, direction])
+        new_x, new_y, direction = _move(deltas, x, y, direction, action)
+        if padded_grid[new_x + 1, new_y + 1] != obstacle:
+            x = new_x
+            y = new_y
+        
+        steps += 1
+        path[steps, 0] = x
+        path[steps, 1] = y
+        
+        if x == goal_x and y == goal_y:
+            break
+        
+        # Break if we're stuck in a loop
+        if steps > 2 and path[steps, 0] == path[steps - 2, 0] and path[steps, 1] == path[steps - 2, 1]:
+            break
+    
+    return path[:steps + 1], direction
+
 class QLearningAgent:
     """
     Q-Learning Agent for navigating in a grid world environment.
@@ -28,7 +128,14 @@ class QLearningAgent:
         3: "West"
     }
     
-    def __init__(self, world, learning_rate=0.1, discount_factor=0.9, exploration_rate=0.1):
+    # Row/column offset of one step forward for each direction, indexed by direction
+    # (int64, so positions computed from it cannot wrap around on large grids)
+    _DELTAS = np.array([[-1, 0], [0, 1], [1, 0], [0, -1]], dtype=np.int64)
+    
+    # Number of exploration draws taken from the random generator at a time
+    RANDOM_BATCH_SIZE = 1024
+    
+    def __init__(self, world, learning_rate=0.1, discount_factor=0.9, exploration_rate=0.1, seed=None):
         """
         Initialize the Q-Learning Agent.
         
@@ -37,14 +144,23 @@ class QLearningAgent:
             learning_rate: Alpha - learning rate for Q-value updates
             discount_factor: Gamma - discount factor for future rewards
             exploration_rate: Epsilon - probability of taking a random action
+            seed: Seed for the agent's random generator (None for a random seed)
         """
         self.world = world
         self.learning_rate = learning_rate
         self.discount_factor = discount_factor
         self.exploration_rate = exploration_rate
         
-        # Initialize Q-table as a defaultdict to handle new states automatically
-        self.q_table = defaultdict(lambda: np.zeros(len(self.ACTIONS)))
+        # Exploration randomness is drawn from one generator in batches
+        self._rng = np.random.default_rng(seed)
+        self._draw_random_batch()
+        
+        # Initialize Q-table as a dense array indexed by (x, y, direction, action)
+        self.q_table = np.zeros((world.size, world.size, len(self.DIRECTIONS), len(self.ACTIONS)),
+                                dtype=np.float32)
+        
+        # Incremented on every Q-table update, so callers can cache what they derive from it
+        self.q_table_version = 0
         
         # Initialize agent position and direction
         self.reset()
@@ -58,6 +174,7 @@ class QLearningAgent:
         """Reset the agent to the start position."""
         self.position = np.array(self.world.start_position)
         self.direction = 0  # Start facing North
+        self._goal_arr = np.asarray(self.world.goal_position)
         return self.get_state()
     
     def get_state(self):
@@ -65,7 +182,8 @@ class QLearningAgent:
         Get the current state representation.
         
         Returns:
-            tuple: (position_x, position_y, direction)
+            tuple: (position_x, position_y, direction), usable directly as a
+                Q-table index
         """
         return (int(self.position[0]), int(self.position[1]), int(self.direction))
     
@@ -79,12 +197,26 @@ class QLearningAgent:
         Returns:
             int: The chosen action
         """
+        # Take the next pre-drawn uniform and random action
+        i = self._random_idx
+        if i == self.RANDOM_BATCH_SIZE:
+            self._draw_random_batch()
+            i = 0
+        self._random_idx = i + 1
+        
         # Exploration: choose a random action
-        if np.random.random() < self.exploration_rate:
-            return np.random.randint(len(self.ACTIONS))
+        if self._uniforms[i] < self.exploration_rate:
+            return self._random_actions[i]
         
         # Exploitation: choose the best action from Q-table
-        return np.argmax(self.q_table[state])
+        return int(self.q_table[state].argmax())
+    
+    def _draw_random_batch(self):
+        """Pre-draw a batch of uniforms and random actions for choose_action."""
+        # Python lists index faster than NumPy arrays for single elements
+        self._uniforms = self._rng.random(self.RANDOM_BATCH_SIZE).tolist()
+        self._random_actions = self._rng.integers(len(self.ACTIONS), size=self.RANDOM_BATCH_SIZE).tolist()
+        self._random_idx = 0
     
     def step(self, action):
         """
@@ -106,31 +238,17 @@ class QLearningAgent:
         # Execute the action
         if action == 0:  # Forward
             # Move in the current direction
-            if self.direction == 0:  # North
-                self.position[0] -= 1
-            elif self.direction == 1:  # East
-                self.position[1] += 1
-            elif self.direction == 2:  # South
-                self.position[0] += 1
-            elif self.direction == 3:  # West
-                self.position[1] -= 1
+            self.position += self._DELTAS[self.direction]
         
         elif action == 1:  # Turn Right
-            self.direction = (self.direction + 1) % 4
+            self.direction = (self.direction + 1) & 3
         
         elif action == 2:  # Turn Left
-            self.direction = (self.direction - 1) % 4
+            self.direction = (self.direction - 1) & 3
         
         elif action == 3:  # Backward
             # Move in the opposite direction
-            if self.direction == 0:  # North
-                self.position[0] += 1
-            elif self.direction == 1:  # East
-                self.position[1] -= 1
-            elif self.direction == 2:  # South
-                self.position[0] -= 1
-            elif self.direction == 3:  # West
-                self.position[1] += 1
+            self.position -= self._DELTAS[self.direction]
         
         # Check if the new position is valid
         if not self.is_valid_position(self.position):
@@ -139,7 +257,7 @@ class QLearningAgent:
             reward = -1.0  # Penalty for hitting a wall or obstacle
         else:
             # Check if the agent reached the goal
-            if np.array_equal(self.position, self.world.goal_position):
+            if self.position[0] == self._goal_arr[0] and self.position[1] == self._goal_arr[1]:
                 reward = 10.0  # Reward for reaching the goal
                 done = True
             else:
@@ -148,6 +266,57 @@ class QLearningAgent:
         
         return self.get_state(), reward, done
     
+    def step_and_update(self, action):
+        """
+        Take a step and update the Q-table in one compiled call.
+        
+        Equivalent to calling step() and then update_q_table() with the
+        resulting transition.
+        
+        Args:
+            action: The action to take (0=Forward, 1=Turn Right, 2=Turn Left, 3=Backward)
+            
+        Returns:
+            tuple: (next_state, reward, done)
+        """
+        goal = self._goal_arr
+        x, y, direction, reward, done = _step_and_update(
+            self.q_table, self.world.padded_grid, self._DELTAS, self.world.OBSTACLE,
+            int(self.position[0]), int(self.position[1]), self.direction, action,
+            self.learning_rate, self.discount_factor, goal[0], goal[1])
+        
+        self.position[0] = x
+        self.position[1] = y
+        self.direction = direction
+        self.q_table_version += 1
+        
+        return (x, y, direction), reward, done
+    
+    def greedy_path(self, max_steps=1000):
+        """
+        Follow the learned policy from the start position without exploring.
+        
+        The agent is reset first and left at the end of the path.
+        
+        Args:
+            max_steps: Maximum steps to prevent infinite loops
+            
+        Returns:
+            numpy.ndarray: Array of positions along the path, starting at the start position
+        """
+        self.reset()
+        
+        goal = self._goal_arr
+        path, direction = _greedy_path(
+            self.q_table, self.world.padded_grid, self._DELTAS, self.world.OBSTACLE,
+            int(self.position[0]), int(self.position[1]), self.direction,
+            goal[0], goal[1], max_steps)
+        
+        self.position[:] = path[-1]
+        self.direction = direction
+        
+        return path
+    
     def update_q_table(self, state, action, reward, next_state, done):
         """
         Update the Q-table using the Q-learning update rule.
@@ -159,17 +328,15 @@ class QLearningAgent:
             next_state: The next state
             done: Whether the episode is done
         """
-        # Get the current Q-value
-        current_q = self.q_table[state][action]
+        # Index the full (x, y, direction, action) entry so the update is a single store
+        index = state + (action,)
         
         # Calculate the maximum Q-value for the next state
-        max_next_q = np.max(self.q_table[next_state]) if not done else 0
+        max_next_q = self.q_table[next_state].max() if not done else 0.0
         
-        # Calculate the new Q-value using the Q-learning update rule
-        new_q = current_q + self.learning_rate * (reward + self.discount_factor * max_next_q - current_q)
-        
-        # Update the Q-table
-        self.q_table[state][action] = new_q
+        # Update the Q-table in place using the Q-learning update rule
+        self.q_table[index] += self.learning_rate * (reward + self.discount_factor * max_next_q - self.q_table[index])
+        self.q_table_version += 1
     
     def is_valid_position(self, position):
         """
@@ -181,16 +348,9 @@ class QLearningAgent:
         Returns:
             bool: True if the position is valid, False otherwise
         """
-        # Check if the position is within bounds
-        if (position[0] < 0 or position[0] >= self.world.size or
-            position[1] < 0 or position[1] >= self.world.size):
-            return False
-        
-        # Check if the position is an obstacle
-        if self.world.is_obstacle(position):
-            return False
-        
-        return True
+        # The obstacle border around the padded grid makes out-of-bounds
+        # positions obstacles as well, so one lookup covers both checks
+        return self.world.padded_grid[position[0] + 1, position[1] + 1] != self.world.OBSTACLE
     
     def _calculate_reward(self):
         """
@@ -200,14 +360,14 @@ class QLearningAgent:
             A numerical reward value
         """
         # Check if agent reached the goal
-        if np.array_equal(self.position, self.world.goal_pos):
+        if self.position[0] == self._goal_arr[0] and self.position[1] == self._goal_arr[1]:
             return 100  # High reward for reaching the goal
         
         # Penalty for each step to encourage finding the shortest path
         step_penalty = -0.1
         
         # Calculate distance to goal (Manhattan distance)
-        distance_to_goal = np.sum(np.abs(self.position - np.array(self.world.goal_pos)))
+        distance_to_goal = np.abs(self.position - self._goal_arr).sum()
         
         # Small reward for getting closer to the goal
         proximity_reward = -0.1 * distance_to_goal
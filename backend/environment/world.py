@@ -1,7 +1,5 @@
 import numpy as np
-import random
 import logging
-import matplotlib.pyplot as plt
 
 logger = logging.getLogger(__name__)
 
@@ -20,18 +18,26 @@ class World:
     DOWN = 2
     LEFT = 3
     
-    def __init__(self, size=15, obstacle_density=0.3):
+    def __init__(self, size=15, obstacle_density=0.3, seed=None):
         """Initialize the world with given size and obstacle density
         
         Args:
             size (int): The size of the square grid world
             obstacle_density (float): Percentage of cells that are obstacles (0.0 to 1.0)
+            seed (int): Seed for the world's random generator (None for a random seed)
         """
         self.size = size
         self.obstacle_density = obstacle_density
-        self.grid = None
+        self._rng = np.random.default_rng(seed)
+        
+        # Grid surrounded by a one-cell border of obstacles, so obstacle checks at
+        # (row + 1, col + 1) need no bounds checks. self.grid is a view of its
+        # interior, which keeps the two in sync without copying.
+        self.padded_grid = np.full((size + 2, size + 2), self.OBSTACLE, dtype=np.int8)
+        self.grid = self.padded_grid[1:-1, 1:-1]
         self.start_position = None
         self.goal_position = None
+        self.agent_position = None
         self.obstacles = None
         self.reset()
         
@@ -39,80 +45,75 @@ class World:
     
     def reset(self):
         """Reset the environment to initial state"""
-        # Create an empty grid
-        self.grid = np.zeros((self.size, self.size), dtype=int)
+        # Clear the grid (the obstacle border of padded_grid is left in place)
+        self.grid[:] = self.EMPTY
         
         # Add obstacles randomly based on density
         num_obstacles = int(self.size * self.size * self.obstacle_density)
-        obstacle_positions = random.sample(range(self.size * self.size), num_obstacles)
-        
-        obstacle_coords = []
-        for pos in obstacle_positions:
-            row = pos // self.size
-            col = pos % self.size
-            self.grid[row, col] = self.OBSTACLE
-            obstacle_coords.append((row, col))
-        
-        self.obstacles = np.array(obstacle_coords)
+        flat_idx = self._rng.choice(self.size * self.size, num_obstacles, replace=False)
+        rows, cols = np.unravel_index(flat_idx, (self.size, self.size))
+        self.grid[rows, cols] = self.OBSTACLE
+        self.obstacles = np.stack([rows, cols], axis=1)
         
         # Find valid positions for agent and goal (not on obstacles)
-        valid_positions = []
-        for i in range(self.size):
-            for j in range(self.size):
-                if self.grid[i, j] == self.EMPTY:
-                    valid_positions.append((i, j))
+        valid_positions = np.argwhere(self.grid == self.EMPTY)
         
         if len(valid_positions) < 2:
             raise ValueError("Not enough empty cells for agent and goal")
         
         # Place agent and goal
-        self.start_position = np.array(random.choice(valid_positions))
-        valid_positions.remove(tuple(self.start_position))
+        start_idx = self._rng.integers(len(valid_positions))
+        self.start_position = valid_positions[start_idx].copy()
+        valid_positions = np.delete(valid_positions, start_idx, axis=0)
         
         # Try to place goal at a minimum distance from agent
         min_distance = max(3, self.size // 3)  # Minimum distance between agent and goal
-        far_positions = [pos for pos in valid_positions 
-                        if self._manhattan_distance(self.start_position, pos) >= min_distance]
+        distances = np.abs(valid_positions - self.start_position).sum(axis=1)
+        far_positions = valid_positions[distances >= min_distance]
         
-        if far_positions:
-            self.goal_position = np.array(random.choice(far_positions))
+        if len(far_positions):
+            self.goal_position = far_positions[self._rng.integers(len(far_positions))].copy()
         else:
-            self.goal_position = np.array(random.choice(valid_positions))
+            self.goal_position = valid_positions[self._rng.integers(len(valid_positions))].copy()
         
         # Update grid with agent and goal
+        self.agent_position = self.start_position.copy()
         self.grid[tuple(self.start_position)] = self.AGENT
         self.grid[tuple(self.goal_position)] = self.GOAL
         
+        # Read-only view of the live grid handed out instead of per-call copies
+        self._grid_view = self.grid.view()
+        self._grid_view.flags.writeable = False
+        
+        # Start and goal are fixed until the next reset
+        self._start_position_list = self.start_position.tolist()
+        self._goal_position_list = self.goal_position.tolist()
+        
         logger.debug(f"Reset world: start_position={self.start_position}, goal_position={self.goal_position}, obstacles={len(self.obstacles)}")
         
-        return self.grid.copy()
+        return self._grid_view
     
     def reset_agent_position(self):
         """Reset the agent to the start position without resetting the entire environment"""
-        # Find current agent position
-        agent_pos = None
-        for i in range(self.size):
-            for j in range(self.size):
-                if self.grid[i, j] == self.AGENT:
-                    agent_pos = (i, j)
-                    break
-            if agent_pos:
-                break
-        
-        # Clear current agent position if found
-        if agent_pos:
+        # Clear current agent position, which step() keeps up to date
+        agent_pos = tuple(self.agent_position)
+        if self.grid[agent_pos] == self.AGENT:
             self.grid[agent_pos] = self.EMPTY
+        else:
+            # The grid was changed behind our back; clear wherever the agent is drawn
+            self.grid[self.grid == self.AGENT] = self.EMPTY
         
         # Set agent back to start position
-        self.start_position = np.array(self.start_position)
+        self.agent_position = self.start_position.copy()
         
         # Don't overwrite goal if agent and goal are at the same position
-        if not np.array_equal(self.start_position, self.goal_position):
+        start, goal = self.start_position, self.goal_position
+        if start[0] != goal[0] or start[1] != goal[1]:
             self.grid[tuple(self.start_position)] = self.AGENT
         
         logger.debug(f"Reset agent position to start: {self.start_position}")
         
-        return self.grid.copy()
+        return self._grid_view
     
     def is_obstacle(self, position):
         """Check if a position contains an obstacle
@@ -136,7 +137,15 @@ class World:
         """Get the current state of the environment
         
         Returns:
-            numpy.ndarray: Copy of the grid
+            numpy.ndarray: Read-only view of the grid, updated as the world changes
+        """
+        return self._grid_view
+    
+    def get_state_copy(self):
+        """Get a snapshot of the current state of the environment
+        
+        Returns:
+            numpy.ndarray: Mutable copy of the grid
         """
         return self.grid.copy()
     
@@ -144,6 +153,20 @@ class World:
         """Calculate Manhattan distance between two positions"""
         return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
     
+    def __getstate__(self):
+        """Pickle the world without the grid views, which would be copied"""
+        state = self.__dict__.copy()
+        del state['grid']
+        del state['_grid_view']
+        return state
+    
+    def __setstate__(self, state):
+        """Restore a pickled world, rebuilding the grid views onto padded_grid"""
+        self.__dict__.update(state)
+        self.grid = self.padded_grid[1:-1, 1:-1]
+        self._grid_view = self.grid.view()
+        self._grid_view.flags.writeable = False
+    
     def __str__(self):
         """String representation of the grid world"""
         symbols = {
@@ -172,7 +195,7 @@ class World:
             tuple: (next_state, reward, done, info)
         """
         # Get current position
-        row, col = self.start_position
+        row, col = self.agent_position
         
         # Calculate new position based on action
         new_row, new_col = row, col
@@ -195,7 +218,7 @@ class World:
         else:
             # Update agent position in grid
             self.grid[row, col] = self.EMPTY
-            self.start_position = (new_row, new_col)
+            self.agent_position = np.array([new_row, new_col])
             
             # Check if reached goal
             if (new_row, new_col) == tuple(self.goal_position):
@@ -213,13 +236,44 @@ class World:
                 self.grid[new_row, new_col] = self.AGENT
         
         # Return next state, reward, done flag, and info
-        return self.grid.copy(), reward, done, info
+        return self._grid_view, reward, done, info
     
     def get_state_size(self):
         """Return the size of the state vector for the neural network"""
         # Agent position (2) + Goal position (2) + Surroundings (4) + Relative goal position (2)
         return 10
     
+    def get_observation(self, out=None):
+        """Build the flat state vector for the neural network
+        
+        Args:
+            out (numpy.ndarray): Optional float32 array of shape (10,) to fill in place
+            
+        Returns:
+            numpy.ndarray: [agent_row, agent_col, goal_row, goal_col,
+                obstacle_up, obstacle_right, obstacle_down, obstacle_left,
+                goal_row - agent_row, goal_col - agent_col]
+        """
+        if out is None:
+            out = np.empty(self.get_state_size(), dtype=np.float32)
+        
+        row, col = self.agent_position
+        goal_row, goal_col = self.goal_position
+        
+        # Neighbours are read from the padded grid, where (row, col) sits at (row + 1, col + 1)
+        padded = self.padded_grid
+        out[0] = row
+        out[1] = col
+        out[2] = goal_row
+        out[3] = goal_col
+        out[4] = padded[row, col + 1] == self.OBSTACLE
+        out[5] = padded[row + 1, col + 2] == self.OBSTACLE
+        out[6] = padded[row + 2, col + 1] == self.OBSTACLE
+        out[7] = padded[row + 1, col] == self.OBSTACLE
+        out[8] = goal_row - row
+        out[9] = goal_col - col
+        return out
+    
     def get_action_size(self):
         """Return the number of possible actions"""
         return 4
@@ -228,14 +282,17 @@ class World:
         """Return information about the current state of the world"""
         return {
             'grid': self.grid.tolist(),
-            'start_position': self.start_position.tolist(),
-            'goal_position': self.goal_position.tolist(),
+            'start_position': self._start_position_list,
+            'goal_position': self._goal_position_list,
             'size': self.size
         }
     
     def render(self, mode='human'):
         """Render the environment"""
         if mode == 'human':
+            # Imported here so loading the environment doesn't pay for matplotlib
+            import matplotlib.pyplot as plt
+            
             plt.figure(figsize=(8, 8))
             plt.imshow(self.grid, cmap='viridis')
             plt.title('World Grid')
@@ -244,4 +301,4 @@ class World:
             plt.grid(True)
             plt.show()
         
-        return self.grid.copy()
\ No newline at end of file
+        return self._grid_view
\ No newline at end of file
@@ -1,15 +1,23 @@
 import os
 import json
+import base64
+import hashlib
 import logging
-from flask import Flask, request, jsonify
+import orjson
+from flask import Flask, Response, request, stream_with_context
 from flask_cors import CORS
+from flask_compress import Compress
 from dotenv import load_dotenv
 import numpy as np
 import random
 import time
 import sys
-from collections import defaultdict
+import atexit
+import queue
 import threading
+from collections import defaultdict
+import multiprocessing as mp
+from multiprocessing import shared_memory
 
 # Add the parent directory to the path to import from sibling directories
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -30,11 +38,40 @@ load_dotenv()
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}})
 
+# Compress larger responses such as obstacle lists and visited cells. Streamed
+# responses are left alone so training events aren't held back in a buffer.
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 500
+app.config['COMPRESS_STREAMS'] = False
+Compress(app)
+
+def _json(data, status=200):
+    """Serialize data with orjson, writing NumPy arrays and scalars natively"""
+    return app.response_class(orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY),
+                              status=status, mimetype='application/json')
+
 # Global variables to store our environment and agent
 world = None
+world_etag = None     # Hash of the current world's obstacles, start and goal
+world_obstacles = None  # The current world's obstacle mask, bitpacked and base64 encoded
 agent = None
 trainer = None
-training_thread = None
+training_process = None
+status_queue = None   # Status updates sent by the training process
+pump_thread = None    # Applies status_queue updates to training_status as they arrive
+status_lock = threading.Lock()  # Guards training_status and stream_subscribers
+stream_subscribers = set()      # One queue.Queue per open /training_stream
+resume_event = None   # Cleared while training is paused
+stop_flag = None      # Set to make the training process exit
+q_table_shm = None    # Shared memory backing shared_agent's Q-table
+released_shms = []    # Released blocks whose close() must wait for readers to finish
+shared_agent = None
+cached_path = None    # Last find_optimal_path() result
+cached_path_key = None  # (world, agent, q_table_version) the cached path was computed for
+reward_history = None  # Per-episode rewards of the background run, sized up front
+step_history = None    # Per-episode step counts of the background run
+STATUS_FLUSH_INTERVAL = 0.05  # Seconds between status updates from the training process
+# Created once and updated in place for the life of the server
 training_status = {
     "completed": False,
     "current_episode": 0,
@@ -42,12 +79,13 @@ training_status = {
     "training_data": None,
     "current_path": [],  # Track current episode path
     "visited_cells": [],  # Track all visited cells
-    "paused": False      # Track if training is paused
+    "paused": False,     # Track if training is paused
+    "seq": 0             # Bumped whenever current_path or visited_cells change
 }
 
 @app.route('/world', methods=['GET', 'POST'])
 def generate_world():
-    global world
+    global world, world_etag, world_obstacles
     
     if request.method == 'POST':
         data = request.json
@@ -60,39 +98,66 @@ def generate_world():
         world = World(size=size, obstacle_density=obstacle_density)
         world.reset()
         
+        # The layout only changes here, so hash it once for GET's ETag
+        layout_hash = hashlib.blake2b(digest_size=8)
+        for part in (world.obstacles, world.start_position, world.goal_position):
+            layout_hash.update(np.ascontiguousarray(part).tobytes())
+        world_etag = layout_hash.hexdigest()
+        
+        # Send obstacles as a row-major bitmask, one bit per cell, rather than a list of positions
+        world_obstacles = base64.b64encode(np.packbits(world.grid == World.OBSTACLE)).decode()
+        
         # Return the world data
-        return jsonify({
+        return _json({
             'width': world.size,
             'height': world.size,
-            'obstacles': world.obstacles.tolist(),
-            'start_position': world.start_position.tolist(),
-            'goal_position': world.goal_position.tolist()
+            'obstacles_packed': world_obstacles,
+            'obstacles_shape': world.grid.shape,
+            'obstacle_count': len(world.obstacles),
+            'start_position': world.start_position,
+            'goal_position': world.goal_position
         })
     else:
         # Return the current world data
         if world is None:
-            return jsonify({"error": "No world has been generated yet"}), 400
+            return _json({"error": "No world has been generated yet"}, 400)
         
         # If agent has been trained, include the optimal path
         path = None
         if agent is not None and agent.q_table is not None:
             path = find_optimal_path()
-            
-        return jsonify({
-            'width': world.size,
-            'height': world.size,
-            'obstacles': world.obstacles.tolist(),
-            'start_position': world.start_position.tolist(),
-            'goal_position': world.goal_position.tolist(),
-            'path': path
-        })
+        
+        # The path changes as the agent learns, so it gets its own part of the ETag
+        etag = world_etag
+        if path is not None:
+            etag += "-" + hashlib.blake2b(path.tobytes(), digest_size=8).hexdigest()
+        
+        # Skip serializing the world if the client already has this version.
+        # flask-compress tags compressed responses "<etag>:<algorithm>", and
+        # clients send back whichever form they were given.
+        if any(request.if_none_match.contains(tag) for tag in
+               (etag, *(f"{etag}:{alg}" for alg in app.config['COMPRESS_ALGORITHM']))):
+            response = app.response_class(status=304)
+        else:
+            response = _json({
+                'width': world.size,
+                'height': world.size,
+                'obstacles_packed': world_obstacles,
+                'obstacles_shape': world.grid.shape,
+                'obstacle_count': len(world.obstacles),
+                'start_position': world.start_position,
+                'goal_position': world.goal_position,
+                'path': path
+            })
+        response.set_etag(etag)
+        return response
 
 @app.route('/agent', methods=['GET', 'POST'])
 def initialize_agent():
     global world, agent
     
     if world is None:
-        return jsonify({"error": "World must be generated first"}), 400
+        return _json({"error": "World must be generated first"}, 400)
     
     if request.method == 'POST':
         data = request.json
@@ -111,89 +176,223 @@ def initialize_agent():
         )
         
         # Return the agent data
-        return jsonify({
-            'position': agent.position.tolist(),
-            'direction': int(agent.direction)
+        return _json({
+            'position': agent.position,
+            'direction': agent.direction
         })
     else:
         # Return the current agent data
         if agent is None:
-            return jsonify({"error": "No agent has been initialized yet"}), 400
+            return _json({"error": "No agent has been initialized yet"}, 400)
             
-        return jsonify({
-            'position': agent.position.tolist(),
-            'direction': int(agent.direction)
+        return _json({
+            'position': agent.position,
+            'direction': agent.direction
         })
 
-def train_agent_thread(episodes, visualize=False, delay=0):
-    global world, agent, trainer, training_status
+def train_agent_process(world, agent, shm_name, episodes, visualize, delay,
+                        status_queue, resume_event, stop_flag):
+    """Train the agent in a separate process, outside the web server's GIL
+    
+    The Q-table lives in shared memory, so the server sees updates as they
+    happen. Everything else is reported through status_queue, batched by a
+    flusher thread that sends finished episodes every STATUS_FLUSH_INTERVAL
+    seconds, however long the episode in progress takes.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    trainer = None
+    pending_rewards = []
+    pending_steps = []
+    pending_lock = threading.Lock()  # Guards the pending lists and episode
+    training_done = threading.Event()
+    
+    def flush():
+        """Send the episodes finished since the last flush and the latest path
+        (call with pending_lock held)"""
+        nonlocal pending_rewards, pending_steps
+        
+        if not pending_rewards:
+            return
+        
+        # Hand the pending lists over and start new ones rather than copying them
+        status_queue.put({
+            "current_episode": episode,
+            "episode_rewards": pending_rewards,
+            "episode_steps": pending_steps,
+            "current_path": trainer.get_current_path(),
+            "visited_cells": trainer.get_visited_cells(),
+            # Snapshot, since the queue pickles messages later from a background thread
+            "agent_position": agent.position.copy(),
+            "agent_direction": agent.direction,
+            "q_table_version": agent.q_table_version
+        })
+        pending_rewards = []
+        pending_steps = []
+    
+    def flush_periodically():
+        """Flush pending episodes every STATUS_FLUSH_INTERVAL until training ends"""
+        while not training_done.wait(STATUS_FLUSH_INTERVAL):
+            with pending_lock:
+                flush()
     
+    flusher = threading.Thread(target=flush_periodically, daemon=True)
+    episode = 0
     try:
-        # Reset training status
-        training_status["completed"] = False
-        training_status["current_episode"] = 0
-        training_status["total_episodes"] = episodes
-        training_status["training_data"] = {
-            "episode_rewards": [],
-            "episode_steps": []
-        }
-        training_status["current_path"] = []
-        training_status["visited_cells"] = []
-        training_status["paused"] = False
+        agent.q_table = np.frombuffer(shm.buf, dtype=agent.q_table.dtype).reshape(agent.q_table.shape)
         
         # Create a trainer
         trainer = Trainer(agent=agent, world=world)
         
         # Train the agent
-        for episode in range(episodes):
+        flusher.start()
+        while episode < episodes:
+            # Block while training is paused (stopping also sets the event)
+            resume_event.wait()
+            
             # Check if training was stopped completely, exit if true
-            if training_status["completed"]:
+            if stop_flag.is_set():
                 return
-                
-            # Update current episode
-            training_status["current_episode"] = episode + 1
-            
-            # Check if training is paused
-            while training_status["paused"]:
-                time.sleep(0.5)  # Sleep while paused
-                
-                # If training was stopped completely, exit
-                if training_status["completed"]:
-                    return
             
             # Train for one episode
             episode_reward, episode_steps = trainer.train_episode(visualize=visualize)
             
-            # Update training data
-            training_status["training_data"]["episode_rewards"].append(float(episode_reward))
-            training_status["training_data"]["episode_steps"].append(int(episode_steps))
-            
-            # Update path tracking
-            training_status["current_path"] = trainer.get_current_path()
-            training_status["visited_cells"] = trainer.get_visited_cells()
+            with pending_lock:
+                episode += 1
+                pending_rewards.append(episode_reward)
+                pending_steps.append(episode_steps)
             
             # Add delay if visualization is enabled
             if visualize and delay > 0:
                 time.sleep(delay / 1000)  # Convert ms to seconds
         
-        # Find optimal path
-        path = find_optimal_path()
-        
-        # Update training status
-        training_status["completed"] = True
-        
         logger.info(f"Training completed after {episodes} episodes")
         
     except Exception as e:
         logger.error(f"Error during training: {str(e)}")
-        training_status["completed"] = True  # Mark as completed to stop polling
+    finally:
+        # Stop the flusher and report any episodes still pending, including after a stop
+        training_done.set()
+        if flusher.is_alive():
+            flusher.join()
+        with pending_lock:
+            flush()
+        
+        # Drop the view into shared memory before closing it
+        agent.q_table = None
+        shm.close()
+        status_queue.put({"completed": True})
+
+def _share_q_table(agent):
+    """Move the agent's Q-table into shared memory and return the block's name"""
+    global q_table_shm, shared_agent
+    
+    if shared_agent is not agent:
+        _release_q_table()
+        q_table_shm = shared_memory.SharedMemory(create=True, size=agent.q_table.nbytes)
+        # frombuffer keeps the buffer exported while the array lives, so close()
+        # refuses (rather than unmapping the memory) while anything still reads it
+        shared = np.frombuffer(q_table_shm.buf, dtype=agent.q_table.dtype).reshape(agent.q_table.shape)
+        shared[:] = agent.q_table
+        agent.q_table = shared
+        shared_agent = agent
+    
+    return q_table_shm.name
+
+def _release_q_table():
+    """Give the shared agent a private copy of its Q-table and free the shared memory"""
+    global q_table_shm, shared_agent
+    
+    # Retry blocks that were still being read when they were released
+    for shm in released_shms[:]:
+        try:
+            shm.close()
+            released_shms.remove(shm)
+        except BufferError:
+            pass
+    
+    if q_table_shm is None:
+        return
+    
+    shared_agent.q_table = shared_agent.q_table.copy()
+    shared_agent = None
+    q_table_shm.unlink()
+    try:
+        q_table_shm.close()
+    except BufferError:
+        # A request (e.g. a /world GET) still holds the old array; close it later
+        released_shms.append(q_table_shm)
+    q_table_shm = None
+
+atexit.register(_release_q_table)
+
+def _training_in_progress():
+    return training_process is not None and training_process.is_alive()
+
+def _publish(message):
+    """Send a message to every open /training_stream (call with status_lock held)"""
+    for subscriber in stream_subscribers:
+        subscriber.put(message)
+
+def _pump_status_queue(updates, process):
+    """Apply and publish the status updates of one training run as they arrive
+    
+    Runs in a background thread until the run completes, marking it completed
+    even if the process died without saying so. Once the run has been replaced
+    by a new one or reset, updates are dropped; whoever replaced it has already
+    ended its streams.
+    """
+    while True:
+        try:
+            update = updates.get(timeout=1)
+        except queue.Empty:
+            if process.is_alive():
+                continue
+            # The process flushes the queue before exiting, so nothing more
+            # will come; finish the run as if it had reported completion
+            update = {"completed": True}
+        
+        with status_lock:
+            if updates is not status_queue:
+                return
+            
+            if update.get("completed"):
+                training_status["completed"] = True
+                _publish({"completed": True, "seq": training_status["seq"]})
+                return
+            
+            # The Q-table itself is shared; keep the server's copy of its version in step
+            shared_agent.q_table_version = update.pop("q_table_version")
+            
+            # Write the episodes in this batch into the preallocated histories
+            start = training_status["current_episode"]
+            end = update["current_episode"]
+            reward_history[start:end] = update["episode_rewards"]
+            step_history[start:end] = update["episode_steps"]
+            training_status["training_data"] = {
+                "episode_rewards": reward_history[:end],
+                "episode_steps": step_history[:end]
+            }
+            
+            # Update episode counter, path tracking and agent pose
+            training_status.update((key, update[key]) for key in update
+                                   if key not in ("episode_rewards", "episode_steps"))
+            training_status["seq"] += 1
+            
+            # Streams get just this batch of episodes, not the whole history
+            update["seq"] = training_status["seq"]
+            _publish(update)
+
+def _sse_event(data):
+    """Encode data as one Server-Sent Events message"""
+    return b"data: " + orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n\n"
 
 @app.route('/train', methods=['POST'])
 def train_agent():
-    global world, agent, trainer, training_thread, training_status
+    global world, agent, trainer, training_process, training_status
+    global status_queue, pump_thread, resume_event, stop_flag, reward_history, step_history
     
     if world is None or agent is None:
-        return jsonify({"error": "World and agent must be initialized first"}), 400
+        return _json({"error": "World and agent must be initialized first"}, 400)
     
     data = request.json
     episodes = data.get('episodes', 100)
@@ -202,34 +401,65 @@ def train_agent():
     
     logger.info(f"Starting training for {episodes} episodes (visualize={visualize}, delay={delay}ms)")
     
-    # If visualization is enabled, start training in a separate thread
+    # If visualization is enabled, start training in a separate process
     if visualize:
-        if training_thread is not None and training_thread.is_alive():
-            return jsonify({"error": "Training is already in progress"}), 400
+        if _training_in_progress():
+            return _json({"error": "Training is already in progress"}, 400)
+        
+        # Spawn rather than fork, since the server process is multi-threaded
+        ctx = mp.get_context("spawn")
+        
+        # Reset training status
+        with status_lock:
+            # End streams still following the previous run
+            _publish({"completed": True, "seq": training_status["seq"]})
             
-        training_thread = threading.Thread(
-            target=train_agent_thread, 
-            args=(episodes, visualize, delay)
+            training_status["completed"] = False
+            training_status["current_episode"] = 0
+            training_status["total_episodes"] = episodes
+            reward_history = np.empty(episodes, dtype=np.float32)
+            step_history = np.empty(episodes, dtype=np.int32)
+            training_status["training_data"] = {
+                "episode_rewards": reward_history[:0],
+                "episode_steps": step_history[:0]
+            }
+            training_status["current_path"] = []
+            training_status["visited_cells"] = []
+            training_status["paused"] = False
+            training_status["seq"] += 1
+            status_queue = ctx.Queue()
+        
+        resume_event = ctx.Event()
+        resume_event.set()
+        stop_flag = ctx.Event()
+        
+        training_process = ctx.Process(
+            target=train_agent_process,
+            args=(world, agent, _share_q_table(agent), episodes, visualize, delay,
+                  status_queue, resume_event, stop_flag),
+            daemon=True
         )
-        training_thread.start()
+        training_process.start()
+        
+        pump_thread = threading.Thread(target=_pump_status_queue,
+                                       args=(status_queue, training_process), daemon=True)
+        pump_thread.start()
         
-        return jsonify({"message": "Training started in background"})
+        return _json({"message": "Training started in background"})
     else:
         # If visualization is disabled, train synchronously
         trainer = Trainer(agent=agent, world=world)
         
-        episode_rewards = []
-        episode_steps = []
+        episode_rewards = np.empty(episodes, dtype=np.float32)
+        episode_steps = np.empty(episodes, dtype=np.int32)
         
         for episode in range(episodes):
-            episode_reward, episode_steps_count = trainer.train_episode()
-            episode_rewards.append(float(episode_reward))
-            episode_steps.append(int(episode_steps_count))
+            episode_rewards[episode], episode_steps[episode] = trainer.train_episode()
         
         # Find optimal path
         path = find_optimal_path()
         
-        return jsonify({
+        return _json({
             "episode_rewards": episode_rewards,
             "episode_steps": episode_steps
         })
@@ -238,112 +468,205 @@ def train_agent():
 def get_training_status():
     global training_status
     
-    # Include agent position if available
-    if agent is not None:
-        training_status["agent_position"] = agent.position.tolist()
-        training_status["agent_direction"] = int(agent.direction)
+    with status_lock:
+        # Include agent position if available (while training, the training
+        # process reports it with each episode)
+        if agent is not None and not _training_in_progress():
+            training_status["agent_position"] = agent.position
+            training_status["agent_direction"] = agent.direction
+        
+        # Clients pass the last seq they saw; if nothing changed since then, leave
+        # out the path data instead of sending it again
+        since = request.args.get('since', type=int)
+        if since is not None and since == training_status["seq"]:
+            return _json({key: value for key, value in training_status.items()
+                          if key not in ("current_path", "visited_cells")})
+        
+        return _json(training_status)
+
+@app.route('/training_stream', methods=['GET'])
+def stream_training_status():
+    """Push training status updates to the client as Server-Sent Events
+    
+    The first event is the full training status; after that each event holds
+    only what changed: the episodes finished since the previous event, the
+    latest path and the counters. The stream ends with a "completed" event when
+    training completes, or with one that also has "reset" set when the
+    environment is reset or no training has been started since.
+    """
+    subscriber = queue.Queue()
+    
+    # Subscribe and snapshot together so no update is missed or sent twice
+    with status_lock:
+        stream_subscribers.add(subscriber)
+        snapshot = _sse_event(training_status)
+        streaming = pump_thread is not None and pump_thread.is_alive()
+        
+        # Without a run to follow, tell the client to stop instead of letting it reconnect
+        if not streaming and not training_status["completed"]:
+            snapshot += _sse_event({"completed": True, "reset": True, "seq": training_status["seq"]})
+    
+    def generate():
+        try:
+            # Browsers reconnect after the stream ends; wait a second first
+            yield b"retry: 1000\n" + snapshot
+            if not streaming:
+                return
+            
+            while True:
+                try:
+                    message = subscriber.get(timeout=15)
+                except queue.Empty:
+                    # Comment line that keeps idle connections open through proxies
+                    yield b": keep-alive\n\n"
+                    continue
+                
+                yield _sse_event(message)
+                
+                if message.get("completed"):
+                    return
+        finally:
+            with status_lock:
+                stream_subscribers.discard(subscriber)
     
-    return jsonify(training_status)
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
 
 @app.route('/reset', methods=['POST'])
 def reset_environment():
-    global world, agent, trainer, training_thread, training_status
+    global world, agent, trainer, training_process, status_queue, pump_thread
+    
+    # Stop any training in progress
+    if _training_in_progress():
+        stop_flag.set()
+        resume_event.set()
     
     # Reset all global variables
     world = None
     agent = None
     trainer = None
-    training_thread = None
-    training_status = {
-        "completed": False,
-        "current_episode": 0,
-        "total_episodes": 0,
-        "training_data": None,
-        "current_path": [],  # Track current episode path
-        "visited_cells": [],  # Track all visited cells
-        "paused": False      # Track if training is paused
-    }
+    training_process = None
+    with status_lock:
+        # Detach the pump and streams from the old run
+        status_queue = None
+        pump_thread = None
+        
+        # Reset the status dict in place; it is the one object every request serializes
+        training_status.pop("agent_position", None)
+        training_status.pop("agent_direction", None)
+        training_status.update({
+            "completed": False,
+            "current_episode": 0,
+            "total_episodes": 0,
+            "training_data": None,
+            "current_path": [],  # Track current episode path
+            "visited_cells": [],  # Track all visited cells
+            "paused": False,     # Track if training is paused
+            "seq": training_status["seq"] + 1  # Never reused, so stale client seqs can't match
+        })
+        
+        # End any open training streams
+        _publish({"completed": True, "reset": True, "seq": training_status["seq"]})
+    
+    # Free the shared Q-table only now that the pump has let go of the run
+    _release_q_table()
     
     logger.info("Environment reset")
     
-    return jsonify({"message": "Environment reset successfully"})
+    return _json({"message": "Environment reset successfully"})
 
 @app.route('/step', methods=['POST'])
 def take_step():
-    global world, agent, training_status
+    global world, agent
     
     if world is None or agent is None:
-        return jsonify({"error": "World and agent must be initialized first"}), 400
+        return _json({"error": "World and agent must be initialized first"}, 400)
     
     data = request.json
     action = data.get('action')
     
     if action is None:
-        return jsonify({"error": "Action is required"}), 400
+        return _json({"error": "Action is required"}, 400)
     
-    # Take a step
+    # Take a step. The path fields of training_status are written only by the
+    # training run; the frontend tracks manually stepped positions itself.
     next_state, reward, done = agent.step(action)
     
-    # Track the agent's position
-    training_status["current_path"].append(agent.position.tolist())
-    training_status["visited_cells"].append(agent.position.tolist())
-    
-    return jsonify({
-        'position': agent.position.tolist(),
-        'direction': int(agent.direction),
-        'reward': float(reward),
+    return _json({
+        'position': agent.position,
+        'direction': agent.direction,
+        'reward': reward,
         'done': done,
         'world_width': world.size,
         'world_height': world.size
     })
 
 def find_optimal_path():
-    """Find the optimal path using the trained Q-table"""
-    global world, agent, trainer
+    """Find the optimal path using the trained Q-table
+    
+    The path is cached until the world, the agent or its Q-table changes.
+    """
+    global world, agent, trainer, cached_path, cached_path_key
     
     if agent.q_table is None:
         return None
     
+    if (cached_path_key is not None and cached_path_key[0] is world
+            and cached_path_key[1] is agent and cached_path_key[2] == agent.q_table_version):
+        return cached_path
+    
     # Use the trainer to find the optimal path
     if trainer is None:
         trainer = Trainer(agent=agent, world=world)
     
     # Find the optimal path
     path = trainer.find_optimal_path()
+    cached_path = path
+    cached_path_key = (world, agent, agent.q_table_version)
     
-    # Convert numpy array to list for JSON serialization
-    return path.tolist() if path is not None else None
+    # Returned as an ndarray; _json serializes it without a list copy
+    return path
 
 @app.route('/toggle_pause', methods=['POST'])
 def toggle_pause_training():
     global training_status
     
-    if training_thread is None or not training_thread.is_alive():
-        return jsonify({"error": "No training in progress"}), 400
+    if not _training_in_progress():
+        return _json({"error": "No training in progress"}, 400)
     
-    # Toggle pause state
-    training_status["paused"] = not training_status["paused"]
+    # Toggle pause state, keeping the flag, the event and what streams see in step
+    with status_lock:
+        paused = not training_status["paused"]
+        training_status["paused"] = paused
+        if paused:
+            resume_event.clear()
+        else:
+            resume_event.set()
+        _publish({"paused": paused, "seq": training_status["seq"]})
     
-    logger.info(f"Training {'paused' if training_status['paused'] else 'resumed'}")
+    logger.info(f"Training {'paused' if paused else 'resumed'}")
     
-    return jsonify({
-        "paused": training_status["paused"]
+    return _json({
+        "paused": paused
     })
 
 @app.route('/stop_training', methods=['POST'])
 def stop_training():
-    global training_status, training_thread
+    global training_status, training_process
     
-    if training_thread is None or not training_thread.is_alive():
-        return jsonify({"error": "No training in progress"}), 400
+    if not _training_in_progress():
+        return _json({"error": "No training in progress"}, 400)
     
-    # Mark training as completed to stop the thread
-    training_status["paused"] = False
-    training_status["completed"] = True
+    # Signal the training process to stop and mark training as completed
+    with status_lock:
+        stop_flag.set()
+        resume_event.set()
+        training_status["paused"] = False
+        training_status["completed"] = True
     
     logger.info("Training stopped by user")
     
-    return jsonify({
+    return _json({
         "message": "Training stopped"
     })
 
@@ -352,7 +675,7 @@ def reset_agent_position():
     global world, agent
     
     if world is None:
-        return jsonify({"error": "World must be generated first"}), 400
+        return _json({"error": "World must be generated first"}, 400)
     
     # Reset agent position in the world
     world.reset_agent_position()
@@ -363,11 +686,19 @@ def reset_agent_position():
     
     logger.info("Agent position reset to start")
     
-    return jsonify({
-        "position": world.start_position.tolist(),
+    return _json({
+        "position": world.start_position,
         "message": "Agent position reset to start"
     })
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
+    
+    if os.environ.get('FLASK_DEBUG') == '1':
+        # Werkzeug development server, with the debugger and reloader
+        app.run(host='0.0.0.0', port=port, debug=True)
+    else:
+        # World, agent and training status live in this process, so serve from
+        # one process with a thread pool; each open /training_stream holds a thread
+        from waitress import serve
+        serve(app, host='0.0.0.0', port=port, threads=int(os.environ.get('THREADS', 8)))
\ No newline at end of file
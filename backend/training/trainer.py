@@ -11,8 +11,10 @@ class Trainer:
         """Initialize the trainer with an agent and a world"""
         self.agent = agent
         self.world = world
-        self.current_path = []  # Track the current episode path
-        self.visited_cells = []  # Track all visited cells
+        self.current_path = np.empty((0, 2), dtype=np.int32)  # Track the current episode path
+        
+        # Track visits per cell, so memory stays bounded by the grid size
+        self.visit_counts = np.zeros((world.size, world.size), dtype=np.int32)
     
     def train_episode(self, max_steps=1000, visualize=False):
         """
@@ -33,39 +35,44 @@ class Trainer:
         steps = 0
         done = False
         
-        # Reset the current path for this episode
-        self.current_path = []
+        # Bind what the loop uses to locals, saving attribute lookups on every step
+        position = self.agent.position
+        visit_counts = self.visit_counts
+        choose_action = self.agent.choose_action
+        step_and_update = self.agent.step_and_update
+        
+        # Preallocate the path for this episode and add the initial position
+        path = np.empty((max_steps + 1, 2), dtype=np.int32)
+        path[0] = position
+        visit_counts[position[0], position[1]] += 1
         
-        # Add initial position to path
-        self.current_path.append(self.agent.position.copy().tolist())
-        self.visited_cells.append(self.agent.position.copy().tolist())
+        # Get the initial state; after that each step returns the next one
+        state = self.agent.get_state()
         
         # Run the episode
         while not done and steps < max_steps:
-            # Get the current state
-            state = self.agent.get_state()
-            
             # Choose an action using the agent's policy
-            action = self.agent.choose_action(state)
+            action = choose_action(state)
             
-            # Take the action and observe the next state and reward
-            next_state, reward, done = self.agent.step(action)
-            
-            # Add current position to path
-            self.current_path.append(self.agent.position.copy().tolist())
-            self.visited_cells.append(self.agent.position.copy().tolist())
-            
-            # Update the agent's Q-table
-            self.agent.update_q_table(state, action, reward, next_state, done)
+            # Take the action, observe the next state and reward, and update the Q-table
+            next_state, reward, done = step_and_update(action)
             
             # Update episode variables
             total_reward += reward
             steps += 1
             
+            # Add current position to path (step_and_update moves the agent's
+            # position array in place)
+            path[steps] = position
+            visit_counts[position[0], position[1]] += 1
+            
             # Log every 100 steps if the episode is long
             if steps % 100 == 0 and steps > 0:
                 logger.debug(f"Step {steps}, State: {state}, Action: {action}, Reward: {reward:.2f}, Done: {done}")
             
+            # Continue from the state the step returned
+            state = next_state
+            
             # Add a small delay if visualization is enabled
             if visualize:
                 time.sleep(0.01)  # 10ms delay for smoother visualization
@@ -74,6 +81,7 @@ class Trainer:
         logger.info(f"Episode completed: Steps: {steps}, Total Reward: {total_reward:.2f}, Goal Reached: {done}")
         
         # Store the path in the agent for visualization
+        self.current_path = path[:steps + 1]
         self.agent.last_episode_path = self.current_path
         
         return total_reward, steps
@@ -87,43 +95,14 @@ class Trainer:
         Returns:
             numpy.ndarray: Array of positions representing the optimal path
         """
-        # Reset agent to start position
-        self.agent.reset()
-        
-        # Initialize path with start position
-        path = [self.agent.position.copy()]
-        
-        steps = 0
-        done = False
-        
-        # Follow the optimal policy (no exploration)
-        while not done and steps < max_steps:
-            # Get current state
-            state = self.agent.get_state()
-            
-            # Choose best action according to Q-table (no exploration)
-            action = np.argmax(self.agent.q_table[state])
-            
-            # Take action
-            _, _, done = self.agent.step(action)
-            
-            # Add position to path
-            path.append(self.agent.position.copy())
-            
-            steps += 1
-            
-            # Break if we're stuck in a loop
-            if steps > 2 and np.array_equal(path[-1], path[-3]):
-                break
-        
-        # Convert path to numpy array
-        return np.array(path)
+        # The greedy rollout runs as a single compiled loop inside the agent
+        return self.agent.greedy_path(max_steps)
         
     def get_current_path(self):
         """Get the current episode path
         
         Returns:
-            list: List of positions representing the current episode path
+            numpy.ndarray: Array of positions representing the current episode path
         """
         return self.current_path
         
@@ -131,6 +110,7 @@ class Trainer:
         """Get all visited cells
         
         Returns:
-            list: List of positions representing all visited cells
+            numpy.ndarray: Array of [row, col, visits] rows, one per visited cell
         """
-        return self.visited_cells
\ No newline at end of file
+        rows, cols = np.nonzero(self.visit_counts)
+        return np.stack((rows, cols, self.visit_counts[rows, cols]), axis=1)
\ No newline at end of file
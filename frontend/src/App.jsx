@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import axios from "axios";
 import { motion, AnimatePresence } from "framer-motion";
 import Dashboard from "./components/Dashboard";
@@ -20,9 +20,13 @@ function App() {
   const [currentEpisode, setCurrentEpisode] = useState(0);
   const [totalEpisodes, setTotalEpisodes] = useState(0);
   const [isPaused, setIsPaused] = useState(false);
+  const [trainingPath, setTrainingPath] = useState([]);
+  const [trainingVisitedCells, setTrainingVisitedCells] = useState([]);
   const [visualizationSpeed, setVisualizationSpeed] = useState(0);
   const [activeTab, setActiveTab] = useState("environment"); // 'environment', 'stats' only
   const [isMobileMenuOpen, setIsMobileMenuOpen] = useState(false);
+  // Open /training_stream connection, if any, so it can be closed on reset
+  const trainingStreamRef = useRef(null);
 
   // Function to generate a new world
   const handleGenerateWorld = async (params) => {
@@ -85,16 +89,97 @@ function App() {
       setTotalEpisodes(params.episodes);
       setCurrentEpisode(0);
       setIsPaused(false);
+      setTrainingPath([]);
+      setTrainingVisitedCells([]);
 
-      // If visualization is enabled, we'll poll for updates
+      // If visualization is enabled, we'll stream updates
       if (params.visualizeTraining) {
-        // Start training in the background
+        // Start training in the background, then subscribe to its updates
         axios
           .post(`${API_URL}/train`, {
             episodes: params.episodes,
             visualize: true,
             delay: params.visualizationSpeed,
           })
+          .then(() => {
+            const eventSource = new EventSource(`${API_URL}/training_stream`);
+            trainingStreamRef.current = eventSource;
+            let episodeRewards = [];
+            let episodeSteps = [];
+
+            eventSource.onmessage = async (event) => {
+              const update = JSON.parse(event.data);
+              const { completed, current_episode, training_data, paused } =
+                update;
+
+              // The first event carries the full history, later ones only new episodes
+              if (training_data) {
+                episodeRewards = training_data.episode_rewards;
+                episodeSteps = training_data.episode_steps;
+              }
+              if (update.episode_rewards) {
+                episodeRewards = [...episodeRewards, ...update.episode_rewards];
+                episodeSteps = [...episodeSteps, ...update.episode_steps];
+              }
+
+              if (current_episode !== undefined) {
+                setCurrentEpisode(current_episode);
+              }
+              if (paused !== undefined) {
+                setIsPaused(paused);
+              }
+              // Path data only comes with episode updates
+              if (update.current_path) {
+                setTrainingPath(update.current_path);
+              }
+              if (update.visited_cells) {
+                setTrainingVisitedCells(update.visited_cells);
+              }
+
+              if (training_data || update.episode_rewards) {
+                setTrainingData({
+                  episode_rewards: episodeRewards,
+                  episode_steps: episodeSteps,
+                });
+                // Switch to stats tab when training data is available
+                if (activeTab !== "stats" && current_episode > 5) {
+                  setActiveTab("stats");
+                }
+              }
+
+              if (completed) {
+                eventSource.close();
+                trainingStreamRef.current = null;
+                setTrainingInProgress(false);
+
+                // After a reset there is no world to fetch
+                if (update.reset) return;
+
+                try {
+                  // Get final world data with optimal path
+                  const worldResponse = await axios.get(`${API_URL}/world`);
+                  setWorldData(worldResponse.data);
+                  // Switch back to environment tab when training is complete
+                  setActiveTab("environment");
+                } catch (worldErr) {
+                  console.error("Error fetching final world data:", worldErr);
+                  setError(
+                    `Failed to fetch final world data: ${
+                      worldErr.response?.data?.error || worldErr.message
+                    }`
+                  );
+                }
+              }
+            };
+
+            eventSource.onerror = (streamErr) => {
+              // The browser retries dropped streams on its own; only give up once it has
+              if (eventSource.readyState === EventSource.CLOSED) {
+                console.error("Error streaming training status:", streamErr);
+                setTrainingInProgress(false);
+              }
+            };
+          })
           .catch((err) => {
             console.error("Training error:", err);
             setError(
@@ -102,43 +187,6 @@ function App() {
             );
             setTrainingInProgress(false);
           });
-
-        // Start polling for updates
-        const pollInterval = setInterval(async () => {
-          try {
-            const statusResponse = await axios.get(
-              `${API_URL}/training_status`
-            );
-            const { completed, current_episode, training_data, paused } =
-              statusResponse.data;
-
-            setCurrentEpisode(current_episode);
-            setIsPaused(paused);
-
-            if (training_data) {
-              setTrainingData(training_data);
-              // Switch to stats tab when training data is available
-              if (activeTab !== "stats" && current_episode > 5) {
-                setActiveTab("stats");
-              }
-            }
-
-            if (completed) {
-              clearInterval(pollInterval);
-              setTrainingInProgress(false);
-
-              // Get final world data with optimal path
-              const worldResponse = await axios.get(`${API_URL}/world`);
-              setWorldData(worldResponse.data);
-              // Switch back to environment tab when training is complete
-              setActiveTab("environment");
-            }
-          } catch (pollErr) {
-            console.error("Error polling training status:", pollErr);
-            clearInterval(pollInterval);
-            setTrainingInProgress(false);
-          }
-        }, 1000); // Poll every second
       } else {
         // If visualization is disabled, just wait for training to complete
         const response = await axios.post(`${API_URL}/train`, {
@@ -173,6 +221,14 @@ function App() {
 
       await axios.post(`${API_URL}/reset`);
 
+      // Stop following any background training
+      trainingStreamRef.current?.close();
+      trainingStreamRef.current = null;
+      setTrainingInProgress(false);
+      setIsPaused(false);
+      setTrainingPath([]);
+      setTrainingVisitedCells([]);
+
       setWorldData(null);
       setAgentData(null);
       setTrainingData(null);
@@ -334,6 +390,8 @@ function App() {
               currentEpisode={currentEpisode}
               totalEpisodes={totalEpisodes}
               isPaused={isPaused}
+              trainingPath={trainingPath}
+              trainingVisitedCells={trainingVisitedCells}
             />
           </div>
         </div>
@@ -3,11 +3,8 @@ import PropTypes from 'prop-types';
 import { motion } from 'framer-motion';
 import World from './World';
 import Agent from './Agent';
-import axios from 'axios';
 
-const API_URL = 'http://localhost:5000';
-
-const EnvironmentVisualization = ({ worldData, agentData, isLoading, trainingInProgress, currentEpisode, totalEpisodes, isPaused }) => {
+const EnvironmentVisualization = ({ worldData, agentData, isLoading, trainingInProgress, currentEpisode, totalEpisodes, isPaused, trainingPath, trainingVisitedCells }) => {
   // Track visited cells for heatmap visualization
   const [visitedCells, setVisitedCells] = useState([]);
   const [episodeVisitedCells, setEpisodeVisitedCells] = useState([]);
@@ -39,29 +36,18 @@ const EnvironmentVisualization = ({ worldData, agentData, isLoading, trainingInP
     }
   }, [currentEpisode]);
   
-  // Poll for training status to update visited cells during training
+  // Show the path data App receives from the training stream
   useEffect(() => {
-    if (!trainingInProgress) return;
-    
-    const pollInterval = setInterval(async () => {
-      try {
-        const response = await axios.get(`${API_URL}/training_status`);
-        const { current_path, visited_cells } = response.data;
-        
-        if (current_path && current_path.length > 0) {
-          setEpisodeVisitedCells(current_path);
-        }
-        
-        if (visited_cells && visited_cells.length > 0) {
-          setVisitedCells(visited_cells);
-        }
-      } catch (error) {
-        console.error('Error polling training status:', error);
-      }
-    }, 500); // Poll every 500ms
-    
-    return () => clearInterval(pollInterval);
-  }, [trainingInProgress]);
+    if (trainingPath && trainingPath.length > 0) {
+      setEpisodeVisitedCells(trainingPath);
+    }
+  }, [trainingPath]);
+  
+  useEffect(() => {
+    if (trainingVisitedCells && trainingVisitedCells.length > 0) {
+      setVisitedCells(trainingVisitedCells);
+    }
+  }, [trainingVisitedCells]);
   
   // Handle agent position changes
   const handleAgentPositionChange = (position) => {
@@ -340,7 +326,7 @@ const EnvironmentVisualization = ({ worldData, agentData, isLoading, trainingInP
             
             <div className="bg-dark-800/50 p-3 rounded-lg border border-primary-900/30 backdrop-blur-sm">
               <h4 className="text-xs font-medium text-dark-400 mb-1">Obstacles</h4>
-              <p className="text-sm font-medium text-primary-300">{worldData.obstacles?.length || 0} cells</p>
+              <p className="text-sm font-medium text-primary-300">{worldData.obstacle_count || 0} cells</p>
             </div>
             
             <div className="bg-dark-800/50 p-3 rounded-lg border border-primary-900/30 backdrop-blur-sm">
@@ -445,7 +431,9 @@ EnvironmentVisualization.propTypes = {
   trainingInProgress: PropTypes.bool,
   currentEpisode: PropTypes.number,
   totalEpisodes: PropTypes.number,
-  isPaused: PropTypes.bool
+  isPaused: PropTypes.bool,
+  trainingPath: PropTypes.arrayOf(PropTypes.arrayOf(PropTypes.number)),
+  trainingVisitedCells: PropTypes.arrayOf(PropTypes.arrayOf(PropTypes.number))
 };
 
 EnvironmentVisualization.defaultProps = {
@@ -455,7 +443,9 @@ EnvironmentVisualization.defaultProps = {
   trainingInProgress: false,
   currentEpisode: 0,
   totalEpisodes: 0,
-  isPaused: false
+  isPaused: false,
+  trainingPath: [],
+  trainingVisitedCells: []
 };
 
 export default EnvironmentVisualization; 
\ No newline at end of file
@@ -5,14 +5,21 @@ import { motion } from 'framer-motion';
 const World = ({ data, visitedCells = [], currentPath = [] }) => {
   if (!data) return null;
   
-  const { width, height, obstacles, start_position, goal_position, path } = data;
+  const { width, height, obstacles_packed, obstacles_shape, start_position, goal_position, path } = data;
+  
+  // Obstacles arrive as a base64 bitmask in row-major order, first cell in the
+  // most significant bit of the first byte (as packed by np.packbits)
+  const obstacleBits = obstacles_packed
+    ? Uint8Array.from(atob(obstacles_packed), c => c.charCodeAt(0))
+    : null;
   
   // Create a grid of cells
   const cells = [];
   for (let y = 0; y < height; y++) {
     for (let x = 0; x < width; x++) {
       // Check if this cell is an obstacle
-      const isObstacle = obstacles?.some(pos => pos[0] === x && pos[1] === y) || false;
+      const bit = obstacleBits ? x * obstacles_shape[1] + y : -1;
+      const isObstacle = bit >= 0 && ((obstacleBits[bit >> 3] >> (7 - (bit & 7))) & 1) === 1;
       
       // Check if this cell is the start position
       const isStart = start_position && start_position[0] === x && start_position[1] === y;
@@ -27,7 +34,10 @@ const World = ({ data, visitedCells = [], currentPath = [] }) => {
       const isCurrentPath = currentPath?.some(pos => pos[0] === x && pos[1] === y) || false;
       
       // Check if this cell has been visited during training
-      const visitCount = visitedCells.filter(pos => pos[0] === x && pos[1] === y).length;
+      // (entries are [x, y] per visit or [x, y, visits] per cell)
+      const visitCount = visitedCells
+        .filter(pos => pos[0] === x && pos[1] === y)
+        .reduce((count, pos) => count + (pos[2] ?? 1), 0);
       const isVisited = visitCount > 0;
       
       // Calculate heat intensity based on visit count (for heatmap effect)
@@ -246,7 +256,8 @@ World.propTypes = {
   data: PropTypes.shape({
     width: PropTypes.number.isRequired,
     height: PropTypes.number.isRequired,
-    obstacles: PropTypes.arrayOf(PropTypes.arrayOf(PropTypes.number)),
+    obstacles_packed: PropTypes.string,
+    obstacles_shape: PropTypes.arrayOf(PropTypes.number),
     start_position: PropTypes.arrayOf(PropTypes.number),
     goal_position: PropTypes.arrayOf(PropTypes.number),
     path: PropTypes.arrayOf(PropTypes.arrayOf(PropTypes.number))